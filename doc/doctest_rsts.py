@@ -12,37 +12,44 @@ import nbformat
 
 from nbconvert.preprocessors import CellExecutionError, ExecutePreprocessor
 
-from cogent3.app.composable import define_app
+from cogent3.app.composable import NotCompleted, define_app
 from cogent3.util.io import atomic_write
 
 
 DATA_DIR = pathlib.Path(__file__).parent / "data"
 
 
-def execute_ipynb(file_paths, exit_on_first, verbose):
+@define_app
+def execute_notebook(test: pathlib.Path | str) -> bool:
+    path = pathlib.Path(test)
+    with open(path) as f:
+        nb = nbformat.read(f, as_version=4)
+    ep = ExecutePreprocessor(
+        timeout=600, kernel_name="python3", store_widget_state=True
+    )
     failed = False
-    for test in file_paths:
-        path = pathlib.Path(test)
-        print()
-        print("=" * 40)
-        print(test)
-        with open(test) as f:
-            nb = nbformat.read(f, as_version=4)
-        ep = ExecutePreprocessor(
-            timeout=600, kernel_name="python3", store_widget_state=True
-        )
-        try:
-            ep.preprocess(nb, {"metadata": {"path": path.parent}})
-        except CellExecutionError:
-            failed = True
-
-        with atomic_write(test, mode="w") as f:
-            nbformat.write(nb, f)
-
-        if failed and exit_on_first:
-            raise SystemExit(
-                f"notebook execution failed in {test}, error saved " "in notebook"
-            )
+    try:
+        ep.preprocess(nb, {"metadata": {"path": path.parent}})
+    except CellExecutionError:
+        failed = True
+        click.secho(f"FAILED: {str(path)}, error saved in notebook", fg="red")
+
+    with atomic_write(path, mode="w") as f:
+        nbformat.write(nb, f)
+
+    return not failed
+
+
+def execute_ipynb(file_paths, exit_on_first, verbose):
+    runfile = execute_notebook()
+    for result in runfile.as_completed(file_paths, parallel=True):
+        if isinstance(result, NotCompleted):
+            # errors other than a failing cell, e.g. a timeout or dead
+            # kernel, abort the run as the notebook was not rewritten
+            click.secho(result.message, fg="red")
+            raise SystemExit(f"notebook execution failed in {result.source}")
+        if not result and exit_on_first:
+            raise SystemExit("notebook execution failed, error saved in notebook")
 
 
 @define_app
@@ -171,6 +171,15 @@ class DataStoreABC(ABC):
     def write_log(self, *, unique_id: str, data: StrOrBytes) -> None:
         self._check_writable(unique_id)
 
+    @contextlib.contextmanager
+    def transaction(self):
+        """groups writes made within the block
+
+        Data stores that can commit several writes at once override this,
+        otherwise each write is completed independently.
+        """
+        yield
+
     @property
     def members(self) -> list[DataMemberABC]:
         return self.completed + self.not_completed
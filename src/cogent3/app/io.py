@@ -1,7 +1,11 @@
+import bz2
 import contextlib
+import inspect
 import json
 import os
 import pickle
+import shutil
+import subprocess
 import zipfile
 
 from enum import Enum
@@ -24,6 +28,7 @@ from cogent3.evolve.fast_distance import DistanceMatrix
 from cogent3.format.alignment import FORMATTERS
 from cogent3.parse.sequence import PARSERS
 from cogent3.util.deserialise import deserialise_object
+from cogent3.util.io import open_
 from cogent3.util.misc import extend_docstring_from
 from cogent3.util.table import Table
 
@@ -159,6 +164,12 @@ def open_data_store(
 @define_app(skip_not_completed=False)
 def pickle_it(data: SerialisableType) -> bytes:
     """Serialises data using pickle."""
+    if inspect.isfunction(data) and (
+        "<locals>" in data.__qualname__ or data.__name__ == "<lambda>"
+    ):
+        # pickle stores functions by reference, these cannot be looked up
+        msg = f"cannot pickle local or lambda function {data.__qualname__!r}"
+        return NotCompleted("ERROR", "pickle_it", msg, source=data)
     return pickle.dumps(data)
 
 
@@ -168,6 +179,39 @@ def unpickle_it(data: bytes) -> SerialisableType:
     return pickle.loads(data)
 
 
+# name: (executable, in process compress, in process decompress), the
+# executables produce output compatible with the in process functions
+_PARALLEL_CODECS = {
+    "pigz": ("pigz", gzip_compress, gzip_decompress),
+    "pbzip2": ("pbzip2", bz2.compress, bz2.decompress),
+}
+# below this many bytes the cost of starting an external program outweighs
+# the gain from parallel (de)compression
+_PARALLEL_CODEC_MIN_SIZE = 2**20
+
+
+class _parallel_codec:
+    """(de)compresses bytes using a multithreaded external program"""
+
+    def __init__(self, name: str, decompress: bool = False):
+        if name not in _PARALLEL_CODECS:
+            raise ValueError(
+                f"unknown codec {name!r}, choose from {list(_PARALLEL_CODECS)}"
+            )
+        exe, compressor, decompressor = _PARALLEL_CODECS[name]
+        path = shutil.which(exe)
+        if path is None:
+            raise ValueError(f"{exe!r} is not installed")
+        self._cmnd = [path, "-dc" if decompress else "-c"]
+        self._in_process = decompressor if decompress else compressor
+
+    def __call__(self, data: bytes) -> bytes:
+        if len(data) < _PARALLEL_CODEC_MIN_SIZE:
+            return self._in_process(data)
+        result = subprocess.run(self._cmnd, input=data, capture_output=True, check=True)
+        return result.stdout
+
+
 @define_app(skip_not_completed=False)
 class compress:
     """Compresses bytes data."""
@@ -177,8 +221,14 @@ class compress:
         Parameters
         ----------
         compressor
-            function for compressing bytes data, defaults to gzip
+            function for compressing bytes data, defaults to gzip. Can also
+            be 'pigz' or 'pbzip2', in which case payloads of 1MB or more are
+            compressed by that program (must be installed) using multiple
+            threads. The output is readable by the gzip and bz2 modules
+            respectively.
         """
+        if isinstance(compressor, str):
+            compressor = _parallel_codec(compressor)
         self.compressor = compressor
 
     def main(self, data: bytes) -> bytes:
@@ -195,8 +245,10 @@ class decompress:
         ----------
         decompressor
             a function for decompression, defaults to the gzip decompress
-            function
+            function. Can also be 'pigz' or 'pbzip2', see compress.
         """
+        if isinstance(decompressor, str):
+            decompressor = _parallel_codec(decompressor, decompress=True)
         self.decompressor = decompressor
 
     def main(self, data: bytes) -> bytes:
@@ -266,7 +318,10 @@ def _read_it(path) -> str:
 @_read_it.register
 def _(path: os.PathLike) -> str:
     path = path.expanduser().absolute()
-    return path.read_text()
+    # open_ handles gzip and bzip2 compressed files, we read bytes as its
+    # text mode guesses the encoding from only the start of the file
+    with open_(path, mode="rb") as infile:
+        return infile.read().decode("utf8")
 
 
 @_read_it.register
@@ -628,3 +683,20 @@ class write_db:
             self.data_store.record_type = data
 
         return self.data_store.write(unique_id=identifier, data=blob)
+
+    def write_many(self, items) -> list:
+        """writes (identifier, data) pairs as a single transaction
+
+        Parameters
+        ----------
+        items
+            iterable of (identifier, data) pairs
+
+        Returns
+        -------
+        list of the members written
+        """
+        with self.data_store.transaction():
+            return [
+                self.main(data, identifier=identifier) for identifier, data in items
+            ]
@@ -166,6 +166,34 @@ class DataStoreSqlite(DataStoreABC):
             self.db.close()
         self._open = False
 
+    @contextlib.contextmanager
+    def transaction(self):
+        """groups writes into a single transaction, committed on exit
+
+        Notes
+        -----
+        Otherwise, the database commits after every write. If an exception
+        is raised, all writes within the block are rolled back.
+        """
+        db = self.db
+        if db.in_transaction:
+            # nested, the outer transaction will commit
+            yield
+            return
+
+        log_id = self._log_id
+        db.execute("BEGIN")
+        try:
+            yield
+        except BaseException:
+            db.execute("ROLLBACK")
+            # cached members and a newly created log record are no longer valid
+            self._completed = []
+            self._not_completed = []
+            self._log_id = log_id
+            raise
+        db.execute("COMMIT")
+
     def read(self, identifier: str) -> StrOrBytes:
         """
         identifier string formed from Path(table_name) / identifier
@@ -475,7 +475,8 @@ class PSSM(_MotifNumberArray):
                 motifs
             ), "Mismatch between number of motifs and the background"
             validate_freqs_array(self._background)
-            pssm = safe_log(data) - safe_log(self._background)
+            pssm = safe_log(data)
+            pssm -= safe_log(self._background)
             super(PSSM, self).__init__(
                 pssm, motifs, row_indices=row_indices, dtype=float
             )
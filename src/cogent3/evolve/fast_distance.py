@@ -740,6 +740,13 @@ class DistanceMatrix(DictArray):
             del result[(n1, n1)]
         return result
 
+    def _flat_items(self):
+        return (
+            (coord, value)
+            for coord, value in super()._flat_items()
+            if coord[0] != coord[1]
+        )
+
     def to_rich_dict(self):
         # because dicts with tuples as keys cannot be json'ed, we convert to
         # a list of tuples
@@ -1,26 +1,37 @@
 #!/usr/bin/env python
 """Code for geometric operations, e.g. distances and center of mass."""
+import math
+
+from operator import index
 
 from numpy import (
-    any,
-    append,
+    arange,
     array,
+    asarray,
+    ascontiguousarray,
+    column_stack,
+    concatenate,
     cos,
     delete,
-    exp,
-    insert,
+    einsum,
+    empty,
+    float64,
     linalg,
     log,
     mean,
-    min,
     newaxis,
-    nonzero,
-    pi,
     sin,
     sqrt,
-    sum,
-    take,
+    subtract,
+    where,
 )
+from scipy.special import softmax
+
+from .geometry_numba import aitchison_inner, euclidean_distance
+
+
+# angular increment between successive golden section spiral points
+_GOLDEN_INC = math.pi * (3.0 - math.sqrt(5.0))
 
 
 def center_of_mass(coordinates, weights=-1):
@@ -48,11 +59,14 @@ def center_of_mass_one_array(data, weight_idx=-1):
         weight of the point
     """
     data = array(data)
-    coord_idx = list(range(data.shape[1]))
-    del coord_idx[weight_idx]
-    coordinates = take(data, (coord_idx), 1)
-    weights = take(data, (weight_idx,), 1)
-    return sum(coordinates * weights, 0) / sum(weights, 0)
+    weight_idx = index(weight_idx)
+    weights = data[:, weight_idx]
+    if weight_idx in (-1, data.shape[1] - 1):
+        # weights are the last column, a view suffices
+        coordinates = data[:, :-1]
+    else:
+        coordinates = delete(data, weight_idx, 1)
+    return einsum("i,ij->j", weights, coordinates) / weights.sum()
 
 
 def center_of_mass_two_array(coordinates, weights):
@@ -62,13 +76,9 @@ def center_of_mass_two_array(coordinates, weights):
     weights should be an array of weights. Should have same number of items
         as the coordinates. Can be either row or column.
     """
-    coordinates = array(coordinates)
-    weights = array(weights)
-    try:
-        return sum(coordinates * weights, 0) / sum(weights, 0)
-    except ValueError:
-        weights = weights[:, newaxis]
-        return sum(coordinates * weights, 0) / sum(weights, 0)
+    coordinates = asarray(coordinates)
+    weights = asarray(weights).ravel()
+    return einsum("i,ij->j", weights, coordinates) / weights.sum()
 
 
 def distance(first, second):
@@ -76,7 +86,39 @@ def distance(first, second):
 
     WARNING: Vectors have to be the same dimension.
     """
-    return sqrt(sum(((first - second) ** 2).ravel()))
+    first = _asfloat_c(first)
+    second = _asfloat_c(second)
+    if first.ndim == 1 and second.ndim == 1:
+        if first.shape != second.shape:
+            raise ValueError("Vectors have to be the same dimension")
+        return float64(euclidean_distance(first, second))
+    return linalg.norm(subtract(first, second))
+
+
+def _asfloat_c(x):
+    """returns x as a C-contiguous float64 array, copying only if required"""
+    return ascontiguousarray(x, dtype=float64)
+
+
+def distances(points):
+    """Calculates the Euclidean distances between all pairs of points.
+
+    Parameters
+    ----------
+    points
+        2D array with one point per row
+
+    Returns
+    -------
+    numpy.ndarray
+        square array where element [i, j] is the distance between
+        points[i] and points[j]
+    """
+    points = asarray(points, dtype=float64)
+    if points.ndim != 2:
+        raise ValueError("points must be a 2D array")
+    diff = points[:, newaxis, :] - points[newaxis, :, :]
+    return sqrt(einsum("ijk,ijk->ij", diff, diff))
 
 
 def sphere_points(n):
@@ -88,15 +130,18 @@ def sphere_points(n):
 
         -n: number of points
     """
-    points = []
-    inc = pi * (3 - sqrt(5))
-    offset = 2 / float(n)
-    for k in range(int(n)):
-        y = k * offset - 1 + (offset / 2)
-        r = sqrt(1 - y * y)
-        phi = k * inc
-        points.append([cos(phi) * r, y, sin(phi) * r])
-    return array(points)
+    k = arange(int(n), dtype=float64)
+    offset = 2.0 / n
+    y = k * offset - 1 + (offset / 2)
+    r = sqrt(1 - y * y)
+    phi = k * _GOLDEN_INC
+    return column_stack((cos(phi) * r, y, sin(phi) * r))
+
+
+def _has_nonpositive(x):
+    """True if any element of x is <= 0"""
+    # a single min reduction avoids allocating a boolean mask
+    return x.size > 0 and x.min() <= 0
 
 
 def alr(x, col=-1):
@@ -114,14 +159,21 @@ def alr(x, col=-1):
     -------
     numpy.ndarray
          alr-transformed data projected into R^(n-1)."""
-    x = x.squeeze()
+    x = _asfloat_c(x).squeeze()
     if x.ndim != 1:
         raise ValueError("Input array must be 1D")
-    if any(x <= 0):
+    if _has_nonpositive(x):
         raise ValueError("Cannot have negative or zero proportions")
     logx = log(x)
-    logx_short = delete(logx, col)
-    return (logx_short - logx[col]).squeeze()
+    logx -= logx[col]
+    col %= logx.size
+    if col == logx.size - 1:
+        logx_short = logx[:-1]
+    elif col == 0:
+        logx_short = logx[1:]
+    else:
+        logx_short = concatenate((logx[:col], logx[col + 1 :]))
+    return logx_short.squeeze()
 
 
 def clr(x):
@@ -136,14 +188,59 @@ def clr(x):
     numpy.ndarray
          clr-transformed data projected to hyperplane x1 + ... + xn=0."""
 
-    x = x.squeeze()
+    x = _asfloat_c(x).squeeze()
     if x.ndim != 1:
         raise ValueError("Input array must be 1D")
-    if any(x <= 0):
+    if _has_nonpositive(x):
+        raise ValueError("Cannot have negative or zero proportions")
+    logx = log(x)
+    logx -= mean(logx)
+    return logx.squeeze()
+
+
+def alr_batch(x, col=-1):
+    r"""
+    Additive log ratio (alr) Aitchison transformation of many compositions.
+    Parameters
+    ----------
+    x: numpy.ndarray
+       2D array with one composition (sum = 1) per row
+    col: int
+       The index of the column of x used in the denominator for
+       alr transformations. Defaults to -1.
+    Returns
+    -------
+    numpy.ndarray
+         alr-transformed rows, shape (nrows, ncols - 1)."""
+    x = asarray(x)
+    if x.ndim != 2:
+        raise ValueError("Input array must be 2D")
+    if _has_nonpositive(x):
         raise ValueError("Cannot have negative or zero proportions")
     logx = log(x)
-    gx = mean(logx)
-    return (logx - gx).squeeze()
+    logx -= logx[:, [col]]
+    return delete(logx, col, axis=1)
+
+
+def clr_batch(x):
+    r"""
+    Centre log ratio (clr) Aitchison transformation of many compositions.
+    Parameters
+    ----------
+    x: numpy.ndarray
+       2D array with one composition (sum = 1) per row
+    Returns
+    -------
+    numpy.ndarray
+         clr-transformed rows, each summing to 0."""
+    x = asarray(x)
+    if x.ndim != 2:
+        raise ValueError("Input array must be 2D")
+    if _has_nonpositive(x):
+        raise ValueError("Cannot have negative or zero proportions")
+    logx = log(x)
+    logx -= logx.mean(axis=1, keepdims=True)
+    return logx
 
 
 def clr_inv(x):
@@ -158,12 +255,10 @@ def clr_inv(x):
     numpy.ndarray
        A composition (sum = 1)."""
 
-    x = x.squeeze()
+    x = _asfloat_c(x).squeeze()
     if x.ndim != 1:
         raise ValueError("Input array must be 1D")
-    ex = exp(x)
-    sumexp = sum(ex)
-    return ex / sumexp
+    return softmax(x)
 
 
 def alr_inv(x, col=-1):
@@ -181,16 +276,17 @@ def alr_inv(x, col=-1):
     -------
     numpy.ndarray
          A composition (sum = 1)."""
-    x = x.squeeze()
+    x = _asfloat_c(x).squeeze()
     if x.ndim != 1:
         raise ValueError("Input array must be 1D")
-    if col == -1:
-        x = append(x, 0)
-    else:
-        x = insert(x, col, 0)
-    ex = exp(x)
-    sumexp = sum(ex)
-    return ex / sumexp
+    logx = empty(x.size + 1, dtype=float64)
+    if not -logx.size <= col < logx.size:
+        raise IndexError(f"col {col} is out of bounds for size {logx.size}")
+    col %= logx.size
+    logx[:col] = x[:col]
+    logx[col] = 0
+    logx[col + 1 :] = x[col:]
+    return softmax(logx)
 
 
 def aitchison_distance(x, y):
@@ -204,16 +300,20 @@ def aitchison_distance(x, y):
     -------
     numpy.float64
          A real value of this distance metric >= 0."""
-    if any(x <= 0):
+    x = _asfloat_c(x)
+    y = _asfloat_c(y)
+    if _has_nonpositive(x):
         raise ValueError(
             "Cannot have negative \
                 or zero proportions - parameter 0."
         )
-    if any(y <= 0):
+    if _has_nonpositive(y):
         raise ValueError(
             "Cannot have negative \
                 or zero proportions - parameter 1."
         )
+    if x.ndim == 1 and x.shape == y.shape:
+        return float64(aitchison_inner(x, y))
     return linalg.norm(clr(x / y))
 
 
@@ -232,11 +332,13 @@ def multiplicative_replacement(x, eps=0.01):
     -------
     numpy.ndarray
          Composition with no zero proportions."""
-    if sum(x) == 0:
-        raise ValueError("Input vector cannot total zero.")
-    delta = min(x[nonzero(x)]) * eps
-    if delta < 0:
+    x = asarray(x)
+    if x.size and x.min() < 0:
         raise ValueError("Cannot have negative proportions.")
-    shape_zeros = x < delta
-    y = x + shape_zeros * delta
-    return y / sum(y)
+    positive = x[x > 0]
+    if positive.size == 0:
+        raise ValueError("Input vector cannot total zero.")
+    delta = positive.min() * eps
+    y = where(x < delta, delta, x)
+    y /= y.sum()
+    return y
@@ -0,0 +1,41 @@
+import math
+
+import numba
+
+from numba import njit
+
+
+# turn off code coverage as njit-ted code not accessible to coverage
+
+
+@njit(
+    numba.float64(numba.float64[::1], numba.float64[::1]),
+    cache=True,
+    fastmath=True,
+)
+def euclidean_distance(first, second):  # pragma: no cover
+    """returns the Euclidean distance between two 1D vectors"""
+    total = 0.0
+    for i in range(first.shape[0]):
+        diff = first[i] - second[i]
+        total += diff * diff
+    return math.sqrt(total)
+
+
+@njit(
+    numba.float64(numba.float64[::1], numba.float64[::1]),
+    cache=True,
+    fastmath=True,
+)
+def aitchison_inner(x, y):  # pragma: no cover
+    """returns the Aitchison distance between two 1D compositions"""
+    num = x.shape[0]
+    total = 0.0
+    for i in range(num):
+        total += math.log(x[i] / y[i])
+    mean = total / num
+    total = 0.0
+    for i in range(num):
+        diff = math.log(x[i] / y[i]) - mean
+        total += diff * diff
+    return math.sqrt(total)
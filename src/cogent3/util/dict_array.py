@@ -432,6 +432,11 @@ class DictArray(object):
 
         return result
 
+    def _flat_items(self):
+        """(coordinate, value) pairs in the order of a flattened to_dict()"""
+        # coordinates from product() are in the same (C) order as ravel()
+        return zip(product(*self.template.names), self.array.ravel().tolist())
+
     def to_rich_dict(self):
         data = self.array.tolist()
         return {
@@ -572,12 +577,11 @@ class DictArray(object):
 
         sep = sep or {"tsv": "\t", "csv": ","}[format.lower()]
 
-        data = self.to_dict(flatten=True)
-        rows = [[f"dim-{i + 1}" for i in range(self.array.ndim)] + ["value"]] + [
-            list(map(lambda x: str(x), row))
-            for row in [list(k) + [v] for k, v in data.items()]
+        header = [f"dim-{i + 1}" for i in range(self.array.ndim)] + ["value"]
+        rows = [sep.join(header)] + [
+            sep.join(map(str, (*coord, value))) for coord, value in self._flat_items()
         ]
-        return "\n".join([sep.join(row) for row in rows])
+        return "\n".join(rows)
 
     def to_table(self):
         """return Table instance
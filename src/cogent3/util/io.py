@@ -110,11 +110,15 @@ def open_(filename: os.PathLike, mode="rt", **kwargs) -> IO:
     encoding = kwargs.pop("encoding", None)
     need_encoding = mode.startswith("r") and "b" not in mode
     if need_encoding and "encoding" not in kwargs:
-        with op(filename, mode="rb") as infile:
-            data = infile.read(100)
+        # sniff the encoding and decode from the same handle, rather than
+        # opening the file a second time
+        infile = op(filename, mode=f"{mode.replace('t', '')}b")
+        data = infile.read(100)
+        infile.seek(0)
 
         encoding = detect(data)
         encoding = encoding["encoding"]
+        return TextIOWrapper(infile, encoding=encoding, **kwargs)
 
     return op(filename, mode, encoding=encoding, **kwargs)
 
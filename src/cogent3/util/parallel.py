@@ -1,7 +1,10 @@
+import atexit
 import concurrent.futures as concurrentfutures
+import functools
 import multiprocessing
 import os
 import sys
+import threading
 import warnings
 
 from cogent3.util.misc import extend_docstring_from
@@ -33,18 +36,34 @@ else:
     USING_MPI = False
 
 
-def get_rank():
-    """Returns the rank of the current process"""
+def _get_rank():
     rank = 0
     if MPI is not None:
         rank = COMM.Get_rank()
     else:
         process_name = multiprocessing.current_process().name
         if process_name != "MainProcess":
-            rank = int(process_name.split("-")[-1])
+            try:
+                rank = int(process_name.split("-")[-1])
+            except ValueError:
+                pass
     return rank
 
 
+# (pid, rank) of the process that computed the rank, the pid check ensures
+# a value inherited by a forked child is not reused
+_RANK = None
+
+
+def get_rank():
+    """Returns the rank of the current process"""
+    global _RANK
+    pid = os.getpid()
+    if _RANK is None or _RANK[0] != pid:
+        _RANK = pid, _get_rank()
+    return _RANK[1]
+
+
 def is_master_process():
     """
     Evaluates if current process is master
@@ -69,19 +88,55 @@ def is_master_process():
     return True
 
 
-class PicklableAndCallable:
-    def __init__(self, func):
-        self.func = func
+@functools.lru_cache(maxsize=1)
+def _available_cpus():
+    """returns the number of CPUs the current process may use"""
+    try:
+        # respects cgroup / affinity limits, unlike cpu_count()
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on all platforms
+        return multiprocessing.cpu_count()
+
+
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
 
-    def __call__(self, *args, **kw):
-        return self.func(*args, **kw)
+def _get_process_pool(max_workers):
+    """returns a ProcessPoolExecutor with max_workers
+
+    The pool is created on first use and reused by subsequent calls with
+    the same max_workers, avoiding the cost of spawning worker processes
+    for every call.
+    """
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None or _POOL._max_workers != max_workers or _POOL._broken:
+            if _POOL is not None:
+                _POOL.shutdown()
+            _POOL = concurrentfutures.ProcessPoolExecutor(max_workers)
+        return _POOL
+
+
+@atexit.register
+def _shutdown_process_pool():
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is not None:
+            _POOL.shutdown()
+            _POOL = None
 
 
 def get_default_chunksize(s, max_workers):
-    chunksize, remainder = divmod(len(s), max_workers * 4)
+    """returns chunksize giving ~4 chunks per worker, 1 if s has no length"""
+    try:
+        num = len(s)
+    except TypeError:
+        return 1
+    chunksize, remainder = divmod(num, max_workers * 4)
     if remainder:
         chunksize += 1
-    return chunksize
+    return max(chunksize, 1)
 
 
 def imap(f, s, max_workers=None, use_mpi=False, if_serial="raise", chunksize=None):
@@ -89,11 +144,13 @@ def imap(f, s, max_workers=None, use_mpi=False, if_serial="raise", chunksize=Non
     Parameters
     ----------
     f : callable
-        function that operates on values in s
+        function that operates on values in s, must be picklable (e.g.
+        defined at module level, not a lambda or local function)
     s : iterable
         series of inputs to f
     max_workers : int or None
-        maximum number of workers. Defaults to 1-maximum available.
+        maximum number of workers. Defaults to 1 less than the number of
+        CPUs available to the process (minimum of 1).
     use_mpi : bool
         use MPI for parallel execution.
     if_serial : str
@@ -121,6 +178,10 @@ def imap(f, s, max_workers=None, use_mpi=False, if_serial="raise", chunksize=Non
     if_serial = if_serial.lower()
     assert if_serial in ("ignore", "raise", "warn"), f"invalid choice '{if_serial}'"
 
+    if not chunksize and not hasattr(s, "__len__"):
+        # materialise generators once so a chunksize can be computed
+        s = list(s)
+
     # If max_workers is not defined, get number of all processes available
     # minus 1 to leave for master process
     if use_mpi:
@@ -153,16 +214,13 @@ def imap(f, s, max_workers=None, use_mpi=False, if_serial="raise", chunksize=Non
             yield from executor.map(f, s, chunksize=chunksize)
     else:
         if not max_workers:
-            max_workers = multiprocessing.cpu_count() - 1
-        assert max_workers < multiprocessing.cpu_count()
+            max_workers = max(1, _available_cpus() - 1)
 
         if not chunksize:
             chunksize = get_default_chunksize(s, max_workers)
 
-        f = PicklableAndCallable(f)
-
-        with concurrentfutures.ProcessPoolExecutor(max_workers) as executor:
-            yield from executor.map(f, s, chunksize=chunksize)
+        executor = _get_process_pool(max_workers)
+        yield from executor.map(f, s, chunksize=chunksize)
 
 
 @extend_docstring_from(imap)
@@ -188,8 +246,6 @@ def _as_completed_mpi(f, s, max_workers, if_serial, chunksize=None):
 
     max_workers = max_workers or 1
 
-    f = PicklableAndCallable(f)
-
     if max_workers > COMM.Get_attr(MPI.UNIVERSE_SIZE):
         warnings.warn("max_workers too large, reducing to UNIVERSE_SIZE-1", UserWarning)
 
@@ -208,15 +264,18 @@ def _as_completed_mpi(f, s, max_workers, if_serial, chunksize=None):
 def _as_completed_mproc(f, s, max_workers):
     """multiprocess version of as_completed"""
     if not max_workers:
-        max_workers = multiprocessing.cpu_count() - 1
-    assert max_workers < multiprocessing.cpu_count()
+        max_workers = max(1, _available_cpus() - 1)
 
-    f = PicklableAndCallable(f)
-
-    with concurrentfutures.ProcessPoolExecutor(max_workers=max_workers) as executor:
-        to_do = [executor.submit(f, e) for e in s]
+    executor = _get_process_pool(max_workers)
+    to_do = [executor.submit(f, e) for e in s]
+    try:
         for result in concurrentfutures.as_completed(to_do):
             yield result.result()
+    finally:
+        # the pool is shared, so work the consumer abandoned must not
+        # delay later calls
+        for future in to_do:
+            future.cancel()
 
 
 @extend_docstring_from(imap, pre=True)
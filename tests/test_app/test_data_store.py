@@ -704,3 +704,12 @@ def test_summary_not_completed(dstore, request):
     got = full_dstore.summary_not_completed
     assert got.shape >= (1, 1)
     assert isinstance(got, Table)
+
+
+@pytest.mark.parametrize("newline", ("\n", "\r\n"))
+def test_read_text_encoding(tmp_dir, newline):
+    """read decodes non-ASCII text and translates newlines"""
+    path = tmp_dir / "utf8.fasta"
+    path.write_bytes(f">café naïve{newline}ACGT{newline}".encode("utf8"))
+    dstore = DataStoreDirectory(tmp_dir, suffix="fasta")
+    assert dstore.read("utf8.fasta") == ">café naïve\nACGT\n"
@@ -208,6 +208,32 @@ def test_drop_not_completed(nc_objects):
     assert len(db.not_completed) == 0
 
 
+def test_transaction(completed_objects):
+    """writes in a transaction are committed together"""
+    db = DataStoreSqlite(":memory:", mode=OVERWRITE)
+    with db.transaction():
+        for unique_id, obj in completed_objects.items():
+            db.write(data=obj, unique_id=unique_id)
+        assert db.db.in_transaction
+    assert not db.db.in_transaction
+    assert len(db.completed) == len(completed_objects)
+
+
+def test_transaction_rollback(completed_objects):
+    """writes in a failed transaction are discarded"""
+    db = DataStoreSqlite(":memory:", mode=OVERWRITE)
+    db.write(data="ACGT", unique_id="first")
+    with pytest.raises(ValueError):
+        with db.transaction():
+            for unique_id, obj in completed_objects.items():
+                db.write(data=obj, unique_id=unique_id)
+            raise ValueError("abort")
+    assert [m.unique_id for m in db.completed] == ["first"]
+    # subsequent writes still work
+    db.write(data="ACGT", unique_id="second")
+    assert len(db.completed) == 2
+
+
 def test_contains(sql_dstore):
     """correctly identify when a data store contains a member"""
     assert "brca1.fasta" in sql_dstore
@@ -3,7 +3,17 @@
 from math import sqrt
 from unittest import TestCase, main
 
-from numpy import allclose, arange, array, insert, isclose, sum, take
+from numpy import (
+    allclose,
+    arange,
+    array,
+    float32,
+    float64,
+    insert,
+    isclose,
+    sum,
+    take,
+)
 from numpy.linalg import norm
 from numpy.random import choice, dirichlet
 from numpy.testing import assert_allclose, assert_equal
@@ -11,13 +21,16 @@ from numpy.testing import assert_allclose, assert_equal
 from cogent3.maths.geometry import (
     aitchison_distance,
     alr,
+    alr_batch,
     alr_inv,
     center_of_mass,
     center_of_mass_one_array,
     center_of_mass_two_array,
     clr,
+    clr_batch,
     clr_inv,
     distance,
+    distances,
     multiplicative_replacement,
     sphere_points,
 )
@@ -89,6 +102,8 @@ class CenterOfMassTests(TestCase):
         a1 = array([3])
         a2 = array([-1])
         self.assertEqual(distance(a1, a2), 4)
+        # the numba kernel returns the same type as linalg.norm
+        self.assertIsInstance(distance(a1, a2), float64)
         # for two dimensions, should work e.g. for 3, 4, 5 triangle
         a1 = array([0, 0])
         a2 = array([3, 4])
@@ -103,10 +118,34 @@ class CenterOfMassTests(TestCase):
         self.assertEqual(distance(a2, a2), 0)
         self.assertEqual(distance(a1, a2), distance(a2, a1))
         assert_allclose(distance(a1, a2), sqrt(22.25))
+        # float64 vectors use the compiled kernel
+        a1 = array([0.0, 0.0, 1.5])
+        a2 = array([3.0, 4.0, 1.5])
+        self.assertEqual(distance(a1, a2), 5)
+        with self.assertRaises(ValueError):
+            distance(a1, array([1.0, 2.0]))
+        # non-contiguous or non-float64 input gives the same result
+        a3 = array([[9.0, 3.0], [9.0, 4.0], [9.0, 1.5]])
+        self.assertEqual(distance(a1, a3[:, 1]), 5)
+        self.assertEqual(distance(a1[:2].astype(float32), array([3, 4])), 5)
+
+    def test_distances(self):
+        """distances should return all pairwise Euclidean distances."""
+        points = array([[0, 0], [3, 4], [6, 8], [1.3, 2.1]])
+        got = distances(points)
+        self.assertEqual(got.shape, (4, 4))
+        for i, a in enumerate(points):
+            for j, b in enumerate(points):
+                assert_allclose(got[i, j], distance(a, b))
+        with self.assertRaises(ValueError):
+            distances(points[0])
 
     def test_sphere_points(self):
         """tests sphere points"""
         assert_equal(sphere_points(1), array([[1.0, 0.0, 0.0]]))
+        points = sphere_points(100)
+        self.assertEqual(points.shape, (100, 3))
+        assert_allclose(norm(points, axis=1), 1.0)
 
 
 class TestAitchison(TestCase):
@@ -134,12 +173,54 @@ class TestAitchison(TestCase):
         assert allclose(z, clr_inv(y)), "Failed clr inverse test."
         assert allclose(sum(y), 0), "Failed clr hyperplane test."
 
+    def test_Aitchison_inverse_large_values(self):
+        """inverse transforms should not overflow for large inputs"""
+        x = array([1000.0, 1000.0])
+        assert_allclose(clr_inv(x), [0.5, 0.5])
+        assert_allclose(alr_inv(x), [0.5, 0.5, 0.0])
+        assert_allclose(alr_inv(x, 0), [0.0, 0.5, 0.5])
+
+    def test_Aitchison_batch(self):
+        """batch transforms should match applying the transform per row"""
+        data = dirichlet(self.a, size=5)
+        assert_allclose(clr_batch(data), [clr(row) for row in data])
+        for col in (-1, 0, 2):
+            assert_allclose(alr_batch(data, col), [alr(row, col) for row in data])
+        with self.assertRaises(ValueError):
+            clr_batch(data[0])
+        data[1, 2] = 0
+        with self.assertRaises(ValueError):
+            alr_batch(data)
+
+    def test_Aitchison_nonpositive(self):
+        """transforms should reject compositions with values <= 0"""
+        x = array([0.5, 0.5, 0.0])
+        with self.assertRaises(ValueError):
+            clr(x)
+        with self.assertRaises(ValueError):
+            alr(x)
+        with self.assertRaises(ValueError):
+            aitchison_distance(self.d[0][:3], x)
+
     def test_Aitchison_distance(self):
         x = self.d[0]
         y = self.d[1]
         assert allclose(
             aitchison_distance(x, y), norm(clr(x) - clr(y))
         ), "Failed distance test."
+        # the numba kernel and the numpy fallback return the same type
+        self.assertIsInstance(aitchison_distance(x, y), float64)
+        self.assertIsInstance(aitchison_distance(x[None, :], y[None, :]), float64)
+        # non-float64 input is converted to float64 for the numba kernel
+        assert_allclose(
+            aitchison_distance(x.astype(float32), y.astype(float32)),
+            aitchison_distance(x, y),
+            rtol=1e-5,
+        )
+        # 2D or mismatched shape input uses the numpy implementation
+        expect = norm(clr(x) - clr(y))
+        assert_allclose(aitchison_distance(x[None, :], y[None, :]), expect)
+        assert_allclose(aitchison_distance(x, y[None, :]), expect)
 
     def test_multiplicative_replacement(self):
         x1 = dirichlet(self.a)
@@ -151,6 +232,12 @@ class TestAitchison(TestCase):
         assert isclose(
             sum(u), 1
         ), "Multiplicative replacement does not yield a composition."
+        with self.assertRaisesRegex(ValueError, "cannot total zero"):
+            multiplicative_replacement(array([0.0, 0.0]))
+        with self.assertRaisesRegex(ValueError, "negative proportions"):
+            multiplicative_replacement(array([0.5, -0.1, 0.6]))
+        with self.assertRaisesRegex(ValueError, "negative proportions"):
+            multiplicative_replacement(array([-1.0, 0.0]))
 
 
 if __name__ == "__main__":
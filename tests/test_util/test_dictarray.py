@@ -405,6 +405,18 @@ class DictArrayTest(TestCase):
         with self.assertRaises(ValueError):
             darr.to_string(format="md"),
 
+    def test_to_string_ndim(self):
+        """to_string handles 1D and 3D arrays"""
+        darr = DictArrayTemplate(["AB", "C"]).wrap([0.5, 2])
+        self.assertEqual(darr.to_string(), "dim-1\tvalue\nAB\t0.5\nC\t2.0")
+        darr = DictArrayTemplate(2, list("ab"), 1).wrap(
+            numpy.arange(4).reshape(2, 2, 1)
+        )
+        self.assertEqual(
+            darr.to_string(sep=","),
+            "dim-1,dim-2,dim-3,value\n0,a,0,0\n0,b,0,1\n1,a,0,2\n1,b,0,3",
+        )
+
     def test_to_table(self):
         """creates Table when ndim <= 2"""
         from cogent3.util.table import Table
@@ -259,6 +259,34 @@ def test_path_exists(val, expect):
     assert path_exists(val) == expect
 
 
+@pytest.mark.parametrize(
+    "suffix,opener_name",
+    (("", "open"), (".gz", "gzip_open"), (".bz2", "bzip_open")),
+)
+def test_open_text_single_handle(tmp_dir, suffix, opener_name, monkeypatch):
+    """text mode detects the encoding and decodes from one open handle"""
+    import cogent3.util.io as io_module
+
+    text = ">café naïve\r\nACGT\r\n"
+    path = tmp_dir / f"sample.txt{suffix}"
+    orig = {"": open, ".gz": gzip.open, ".bz2": bz2.open}[suffix]
+    with orig(path, "wb") as outfile:
+        outfile.write(text.encode("utf8"))
+
+    calls = []
+
+    def opener(*args, **kwargs):
+        calls.append(args)
+        return orig(*args, **kwargs)
+
+    monkeypatch.setattr(io_module, opener_name, opener, raising=False)
+    with open_(path) as infile:
+        got = infile.read()
+    assert got == ">café naïve\nACGT\n"
+    assert infile.encoding == "utf-8"
+    assert len(calls) == 1
+
+
 def test_open_reads_zip(tmp_dir):
     """correctly reads a zip compressed file"""
     text_path = tmp_dir / "foo.txt"
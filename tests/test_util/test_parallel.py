@@ -1,7 +1,9 @@
 import multiprocessing
+import pathlib
 import sys
 import time
 
+from tempfile import TemporaryDirectory
 from unittest import TestCase, main, skipIf
 
 import numpy
@@ -15,6 +17,13 @@ def get_process_value(n):
     return (parallel.get_rank(), n)
 
 
+def touch_file(path):
+    # records that the task ran
+    time.sleep(0.1)
+    path.touch()
+    return path
+
+
 def get_ranint(n):
     numpy.random.seed(n)
     return numpy.random.randint(1, 10)
@@ -46,6 +55,34 @@ class ParallelTests(TestCase):
         self.assertEqual(result1[0], result2[0])
         self.assertNotEqual(result1, result2)
 
+    def test_default_chunksize(self):
+        """chunksize should be at least 1 and handle unsized input"""
+        self.assertEqual(parallel.get_default_chunksize(list(range(10)), 2), 2)
+        self.assertEqual(parallel.get_default_chunksize(list(range(8)), 2), 1)
+        self.assertEqual(parallel.get_default_chunksize([], 2), 1)
+        self.assertEqual(parallel.get_default_chunksize(iter(range(10)), 2), 1)
+
+    def test_process_pool_reused(self):
+        """the process pool should be reused for the same max_workers"""
+        pool = parallel._get_process_pool(1)
+        self.assertIs(parallel._get_process_pool(1), pool)
+        self.assertIsNot(parallel._get_process_pool(2), pool)
+        parallel._shutdown_process_pool()
+
+    def test_as_completed_cancels_on_close(self):
+        """futures not yet started are cancelled when the consumer stops"""
+        num_tasks = 20
+        with TemporaryDirectory() as dirname:
+            paths = [pathlib.Path(dirname) / f"{i}.txt" for i in range(num_tasks)]
+            results = parallel.as_completed(touch_file, paths, max_workers=1)
+            next(results)
+            results.close()
+            # shutdown waits for every future that was not cancelled
+            parallel._shutdown_process_pool()
+            num_run = sum(path.exists() for path in paths)
+        self.assertGreaterEqual(num_run, 1)
+        self.assertLess(num_run, num_tasks)
+
     @skipIf(sys.version_info[1] < 7, "method exclusive to Python 3.7 and above")
     def test_is_master_process(self):
         """